@@ -4,9 +4,10 @@
 
 """ Module for the base Block."""
 
+from functools import lru_cache
 from typing import TYPE_CHECKING, List, Optional, OrderedDict, Tuple, Union
 
-from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtCore import QPointF, QRectF, Qt, QTimer
 from PyQt5.QtGui import QBrush, QPen, QColor, QPainter, QPainterPath
 from PyQt5.QtWidgets import (
     QGraphicsItem,
@@ -24,12 +25,64 @@ if TYPE_CHECKING:
     from pyflow.scene.scene import Scene
 
 BACKGROUND_COLOR = QColor("#E3212121")
+PEN_WIDTH = 3
+
+# Minimal delay in ms between two geometry updates while moving or resizing
+UPDATE_INTERVAL = 16
+
+
+def outline_pen(color: str) -> QPen:
+    """Create a pen to draw the outline of blocks."""
+    pen = QPen(QColor(color))
+    pen.setWidth(PEN_WIDTH)
+    return pen
+
+
+@lru_cache(maxsize=64)
+def build_paint_paths(
+    width: float, height: float, edge_size: float, outline_width: float
+) -> Tuple[QPainterPath, QPainterPath, QPainterPath]:
+    """Build the simplified content, outline and selection paths of a block.
+
+    Paths are cached, so blocks sharing the same geometry share their paths.
+
+    """
+    # content
+    path_content = QPainterPath()
+    path_content.setFillRule(Qt.FillRule.WindingFill)
+    path_content.addRoundedRect(0, 0, width, height, edge_size, edge_size)
+
+    # outline
+    path_outline = QPainterPath()
+    path_outline.addRoundedRect(0, 0, width, height, edge_size, edge_size)
+
+    # selection inner outline
+    path_in_outline = QPainterPath()
+    path_in_outline.addRoundedRect(
+        -2 * outline_width,
+        -2 * outline_width,
+        width + 4 * outline_width,
+        height + 4 * outline_width,
+        edge_size + 2 * outline_width,
+        edge_size + 2 * outline_width,
+    )
+
+    return (
+        path_content.simplified(),
+        path_outline.simplified(),
+        path_in_outline.simplified(),
+    )
 
 
 class Block(QGraphicsItem, Serializable):
 
     """Base class for blocks in Pyflow."""
 
+    # Pens and brushes are shared by all blocks
+    _pen_outline = outline_pen("#00000000")
+    _pen_outline_selected = outline_pen("#FFFFA637")
+    _brush_background = QBrush(BACKGROUND_COLOR)
+
     DEFAULT_DATA = {
         "title": "New block",
         "splitter_pos": [0, 0],
@@ -72,12 +125,11 @@ class Block(QGraphicsItem, Serializable):
         self.sockets_in: List[Socket] = []
         self.sockets_out: List[Socket] = []
 
-        self.pen_width = 3
-        self._pen_outline = QPen(QColor("#00000000"))
-        self._pen_outline.setWidth(self.pen_width)
-        self._pen_outline_selected = QPen(QColor("#FFFFA637"))
-        self._pen_outline_selected.setWidth(self.pen_width)
-        self._brush_background = QBrush(BACKGROUND_COLOR)
+        self.pen_width = PEN_WIDTH
+
+        # Paths drawn by paint, rebuilt only when the geometry changes
+        self._paint_cache_key: Optional[Tuple[float, ...]] = None
+        self._paint_paths: Optional[Tuple[QPainterPath, ...]] = None
 
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
@@ -110,6 +162,15 @@ class Block(QGraphicsItem, Serializable):
         self.moved = False
         self.metadata = {}
 
+        # Geometry updates requested by mouse moves are applied at most once
+        # per UPDATE_INTERVAL
+        self._pending_sockets_update = False
+        self._pending_update_all = False
+        self._update_timer = QTimer()
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(UPDATE_INTERVAL)
+        self._update_timer.timeout.connect(self.flush_pending_updates)
+
     def scene(self) -> "Scene":
         """Get the current Scene containing the block."""
         return super().scene()
@@ -125,41 +186,28 @@ class Block(QGraphicsItem, Serializable):
         widget: Optional[QWidget] = None,
     ):
         """Paint the block."""
+        outline_width = self.pen_outline.widthF()
+        paint_cache_key = (self.width, self.height, self.edge_size, outline_width)
+        if paint_cache_key != self._paint_cache_key:
+            self._paint_paths = build_paint_paths(*paint_cache_key)
+            self._paint_cache_key = paint_cache_key
+        path_content, path_outline, path_in_outline = self._paint_paths
 
         # content
-        path_content = QPainterPath()
-        path_content.setFillRule(Qt.FillRule.WindingFill)
-        path_content.addRoundedRect(
-            0, 0, self.width, self.height, self.edge_size, self.edge_size
-        )
         painter.setPen(Qt.PenStyle.NoPen)
         painter.setBrush(self._brush_background)
-        painter.drawPath(path_content.simplified())
+        painter.drawPath(path_content)
 
         # outline
-        path_outline = QPainterPath()
-        path_outline.addRoundedRect(
-            0, 0, self.width, self.height, self.edge_size, self.edge_size
-        )
         painter.setPen(self.pen_outline)
         painter.setBrush(Qt.BrushStyle.NoBrush)
-        painter.drawPath(path_outline.simplified())
+        painter.drawPath(path_outline)
 
         # selection inner outline
         if self.isSelected():
-            path_in_outline = QPainterPath()
-            outline_width = self.pen_outline.widthF()
-            path_in_outline.addRoundedRect(
-                -2 * outline_width,
-                -2 * outline_width,
-                self.width + 4 * outline_width,
-                self.height + 4 * outline_width,
-                self.edge_size + 2 * outline_width,
-                self.edge_size + 2 * outline_width,
-            )
             painter.setPen(self._pen_outline_selected)
             painter.setBrush(Qt.BrushStyle.NoBrush)
-            painter.drawPath(path_in_outline.simplified())
+            painter.drawPath(path_in_outline)
 
     def add_socket(self, socket: Socket):
         """Add a socket to the block."""
@@ -171,6 +219,7 @@ class Block(QGraphicsItem, Serializable):
 
     def mouseReleaseEvent(self, event: QGraphicsSceneMouseEvent):
         """Block reaction to a mouseReleaseEvent."""
+        self.flush_pending_updates()
         if self.moved:
             self.moved = False
             self.scene().history.checkpoint("Moved block", set_modified=True)
@@ -183,8 +232,33 @@ class Block(QGraphicsItem, Serializable):
 
         # Update the position of the sockets of this block
         # and the block it is connected to
-        self.update_sockets()
-        self.update_neighbors_sockets()
+        self.schedule_update_sockets()
+
+    def schedule_update_sockets(self):
+        """Update the sockets of the block and its neighbors at the next update tick."""
+        self._pending_sockets_update = True
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+
+    def schedule_update_all(self):
+        """Update the block parts at the next update tick."""
+        self._pending_update_all = True
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+
+    def flush_pending_updates(self):
+        """Apply the geometry updates requested since the last update tick."""
+        self._update_timer.stop()
+        if not (self._pending_sockets_update or self._pending_update_all):
+            return
+        if self._pending_update_all:
+            self.update_all()
+        if self._pending_sockets_update:
+            self.update_sockets()
+            self.update_neighbors_sockets()
+        self._pending_sockets_update = False
+        self._pending_update_all = False
+        self.update()
 
     def remove(self):
         """Remove the block from the scene containing it."""
@@ -223,21 +297,6 @@ class Block(QGraphicsItem, Serializable):
             int(self.edge_size * 1.7),
         )
 
-    def get_socket_pos(self, socket: Socket) -> Tuple[float]:
-        """Get a socket position to place them on the block sides."""
-        if socket.socket_type == "input":
-            y = 0
-            sockets = self.sockets_in
-        else:
-            y = self.height
-            sockets = self.sockets_out
-
-        # Sockets are evenly spaced out on the whole block width
-        space_between_sockets = self.width / (len(sockets) + 1)
-        x = space_between_sockets * (sockets.index(socket) + 1)
-
-        return x, y
-
     def update_sockets(self):
         """Update the sockets positions."""
 
@@ -256,8 +315,13 @@ class Block(QGraphicsItem, Serializable):
         self.sockets_in.sort(key=x_start_position)
         self.sockets_out.sort(key=x_end_position)
 
-        for socket in self.sockets_in + self.sockets_out:
-            socket.setPos(*self.get_socket_pos(socket))
+        # Sockets are evenly spaced out on the whole block width
+        for sockets, y in ((self.sockets_in, 0), (self.sockets_out, self.height)):
+            if not sockets:
+                continue
+            space_between_sockets = self.width / (len(sockets) + 1)
+            for index, socket in enumerate(sockets, start=1):
+                socket.setPos(space_between_sockets * index, y)
 
     def update_neighbors_sockets(self):
         """Update the sockets positions of all neighboring blocks."""
@@ -295,6 +359,7 @@ class Block(QGraphicsItem, Serializable):
     @width.setter
     def width(self, value: float):
         self.root.setGeometry(0, 0, int(value), self.root.height())
+        self._paint_cache_key = None
 
     @property
     def height(self):
@@ -304,6 +369,7 @@ class Block(QGraphicsItem, Serializable):
     @height.setter
     def height(self, value: float):
         self.root.setGeometry(0, 0, self.root.width(), int(value))
+        self._paint_cache_key = None
 
     @property
     def pen_outline(self) -> QPen:
@@ -3,19 +3,35 @@
 
 """ Module for the base Code Block."""
 
-from typing import TYPE_CHECKING, OrderedDict, Tuple
-
-from ansi2html import Ansi2HTMLConverter
-from PyQt5.QtGui import QColor, QPen
-from PyQt5.QtWidgets import QPushButton, QTextEdit
-
-from pyflow.blocks.block import Block
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, List, Optional, OrderedDict, Tuple
+
+from PyQt5.QtCore import QByteArray, QThreadPool, QUrl
+from PyQt5.QtGui import QPen, QPixmap, QTextCharFormat, QTextCursor, QTextDocument
+from PyQt5.QtWidgets import (
+    QGraphicsItem,
+    QPlainTextEdit,
+    QPushButton,
+    QStackedWidget,
+    QTextBrowser,
+)
+
+from pyflow.blocks.block import Block, outline_pen
 from pyflow.core.edge import Edge
 from pyflow.blocks.executableblock import ExecutableBlock, ExecutableState
 from pyflow.blocks.pyeditor import PythonEditor
 from pyflow.core.add_button import AddEdgeButton, AddNewBlockButton
-
-ansi2html_converter = Ansi2HTMLConverter()
+from pyflow.core.ansi import DEFAULT_STYLE, Style, ansi_to_html
+from pyflow.core.worker import ConversionWorker
+
+# Maximum number of lines kept in the output panel scroll-back
+MAX_OUTPUT_BLOCK_COUNT = 5000
+# Longer lines are cropped in the output panel
+MAX_LINE_LENGTH = 4096
+# Only the end of longer outputs is displayed in the output panel
+MAX_OUTPUT_CHARS = 200_000
+# Name of the image resource displayed by the rich output panel
+OUTPUT_IMAGE_URL = "pyflow-output-image"
 
 if TYPE_CHECKING:
     from PyQt5.QtWidgets import QGraphicsSceneHoverEvent
@@ -39,6 +55,14 @@ class CodeBlock(ExecutableBlock):
     }
     MANDATORY_FIELDS = Block.MANDATORY_FIELDS
 
+    _pen_outlines = {
+        ExecutableState.IDLE: outline_pen("#00000000"),  # No outline
+        ExecutableState.RUNNING: outline_pen("#fffc6107"),  # Dark orange
+        ExecutableState.PENDING: outline_pen("#80fcdb07"),  # Dark yellow
+        ExecutableState.DONE: outline_pen("#158000"),  # Dark green
+        ExecutableState.CRASHED: outline_pen("#ff0000"),  # Red: Crashed
+    }
+
     def __init__(self, source: str = "", **kwargs):
 
         """
@@ -61,23 +85,34 @@ class CodeBlock(ExecutableBlock):
 
         self.output_closed = True
         self._splitter_size = [1, 1]
-        self._cached_stdout = ""
+        # Streamed stdout: chunks of completed lines, their html and the live last line
+        self._stdout_chunks: List[str] = []
+        self._cached_stdout_html: List[str] = []
+        self._stdout_tail = ""
+        # ANSI style active at the end of the converted lines
+        self._stdout_style: Style = DEFAULT_STYLE
+        # True when stdout comes from handle_stdout rather than the setter
+        self._stdout_streamed = False
+        # True when the output panel displays the streamed stdout
+        self._output_panel_streamed = False
+        # True when the output panel is outdated because the block is not displayed
+        self._pending_output = False
+        # Chunks of completed lines waiting to be converted to html in a worker thread
+        self._conversion_queue: List[str] = []
+        self._converting = False
+        # Incremented when stdout is reset to ignore outdated conversions
+        self._conversion_generation = 0
+        # Number of chunks of completed lines converted and displayed
+        self._converted_chunks = 0
+        self._displayed_chunks = 0
         self.blocks_to_run = []
 
-        self._pen_outlines = {
-            ExecutableState.IDLE: QPen(QColor("#00000000")),  # No outline
-            ExecutableState.RUNNING: QPen(QColor("#fffc6107")),  # Dark orange
-            ExecutableState.PENDING: QPen(QColor("#80fcdb07")),  # Dark yellow
-            ExecutableState.DONE: QPen(QColor("#158000")),  # Dark green
-            ExecutableState.CRASHED: QPen(QColor("#ff0000")),  # Red: Crashed
-        }
-        for pen in self._pen_outlines.values():
-            pen.setWidth(self.pen_width)
-
         self.output_panel_background_color = "#1E1E1E"
 
         # Add output pannel
         self.output_panel = self.init_output_panel()
+        self.rich_output_panel = self.init_rich_output_panel()
+        self.output_stack = self.init_output_stack()
         self.run_button = self.init_run_button()
         self.run_all_button = self.init_run_all_button()
         self.add_edge_button = self.init_add_edge_button()
@@ -85,7 +120,7 @@ class CodeBlock(ExecutableBlock):
 
         # Add splitter between source_editor and panel
         self.splitter.addWidget(self.source_editor)
-        self.splitter.addWidget(self.output_panel)
+        self.splitter.addWidget(self.output_stack)
 
         self.title_left_offset = 3 * self.edge_size
 
@@ -97,16 +132,36 @@ class CodeBlock(ExecutableBlock):
         self.update_all()  # Set the geometry of display and source_editor
 
     def init_output_panel(self):
-        """Initialize the output display widget: QLabel."""
-        output_panel = QTextEdit()
+        """Initialize the text output display widget: QPlainTextEdit."""
+        output_panel = QPlainTextEdit()
         output_panel.setReadOnly(True)
+        output_panel.setMaximumBlockCount(MAX_OUTPUT_BLOCK_COUNT)
         output_panel.setFont(self.source_editor.font())
         style_sheet = (
-            f'QTextEdit {{ background-color: "{self.output_panel_background_color}"; }}'
+            "QPlainTextEdit { "
+            f'background-color: "{self.output_panel_background_color}"; }}'
         )
         output_panel.setStyleSheet(style_sheet)
         return output_panel
 
+    def init_rich_output_panel(self):
+        """Initialize the rich output display widget (images and html): QTextBrowser."""
+        rich_output_panel = QTextBrowser()
+        rich_output_panel.setFont(self.source_editor.font())
+        style_sheet = (
+            "QTextBrowser { "
+            f'background-color: "{self.output_panel_background_color}"; }}'
+        )
+        rich_output_panel.setStyleSheet(style_sheet)
+        return rich_output_panel
+
+    def init_output_stack(self):
+        """Initialize the widget switching between the text and rich output panels."""
+        output_stack = QStackedWidget()
+        output_stack.addWidget(self.output_panel)
+        output_stack.addWidget(self.rich_output_panel)
+        return output_stack
+
     def init_run_button(self):
         """Initialize the run button."""
         run_button = QPushButton(">", self.root)
@@ -162,9 +217,7 @@ class CodeBlock(ExecutableBlock):
 
     def run_code(self):
         """Run the code in the block."""
-
-        # Reset stdout
-        self._cached_stdout = ""
+        self.reset_stdout()
 
         # Set button text to ...
         self.run_button.setText("...")
@@ -172,6 +225,24 @@ class CodeBlock(ExecutableBlock):
 
         super().run_code()  # actually run the code
 
+    def reset_stdout(self):
+        """Reset the streamed stdout before a new run.
+
+        The output panel is replaced by the first chunk of the new stdout.
+
+        """
+        self._stdout_chunks.clear()
+        self._cached_stdout_html.clear()
+        self._stdout_tail = ""
+        self._stdout_style = DEFAULT_STYLE
+        self._stdout = None
+        self._output_panel_streamed = False
+        self._conversion_queue.clear()
+        self._converting = False
+        self._conversion_generation += 1
+        self._converted_chunks = 0
+        self._displayed_chunks = 0
+
     def execution_finished(self):
         """Reset the text of the run buttons after it was executed."""
         super().execution_finished()
@@ -247,9 +318,7 @@ class CodeBlock(ExecutableBlock):
         """Change the geometry of the output panel."""
         # Close output panel if no output
         if self.stdout == "":
-            self.previous_splitter_size = self.splitter.sizes()
-            self.output_closed = True
-            self.splitter.setSizes([1, 0])
+            self.update_output_closed(False)
 
     def update_run_all_button(self):
         """Change the geometry of the run all button."""
@@ -299,10 +368,12 @@ class CodeBlock(ExecutableBlock):
     def source(self, value: str):
         if value != self._source:
             # If text has changed, set self and all output blocks to not run
-            output_blocks, _ = self.custom_bfs(self, reverse=True)
-            for block in output_blocks + [self]:
-                block.run_state = ExecutableState.IDLE
-            self.source_editor.setText(value)
+            self.reset_downstream_states()
+            # Avoid re-highlighting the editor when the value comes from it
+            if self.source_editor.text() != value:
+                self.source_editor.blockSignals(True)
+                self.source_editor.setText(value)
+                self.source_editor.blockSignals(False)
             self._source = value
 
     @property
@@ -313,60 +384,337 @@ class CodeBlock(ExecutableBlock):
     @property
     def stdout(self) -> str:
         """Access the content of the output panel of the block."""
+        if self._stdout is None:
+            self._stdout = "\n".join(self._stdout_chunks)
+            if self._stdout_chunks:
+                self._stdout += "\n"
+            self._stdout += self._stdout_tail
         return self._stdout
 
     @stdout.setter
     def stdout(self, value: str):
         self._stdout = value
+        self._stdout_streamed = False
+        self._output_panel_streamed = False
         if hasattr(self, "output_panel"):
-            if value.startswith("<img>"):
-                display_text = self.b64_to_html(value[5:])
-            elif value.startswith("<div>"):
-                display_text = value
+            # Nothing to show in a closed output panel
+            if self.output_closed and value == "":
+                self._pending_output = False
+                return
+            self.update_output_closed(value != "")
+            if self.is_output_displayed():
+                self.display_stdout()
             else:
-                display_text = self.str_to_html(value)
-            self.output_panel.setText(display_text)
+                self._pending_output = True
+
+    def is_output_displayed(self) -> bool:
+        """Check if the block, and thus its output panel, is displayed."""
+        return self.scene() is not None and self.isVisible()
+
+    def display_stdout(self):
+        """Display the whole stdout in the output panel."""
+        self._pending_output = False
+        value = self.stdout
+        if self._stdout_streamed:
+            html = None
+            # Lines still being converted are converted again with the others
+            if self._converted_chunks == len(self._stdout_chunks):
+                html = "".join(self._cached_stdout_html)
+                html += self.str_to_html(self._stdout_tail, self._stdout_style)[0]
+            self.display_text(value, html)
+            self.output_stack.setCurrentWidget(self.output_panel)
+            self._output_panel_streamed = True
+            self._displayed_chunks = len(self._stdout_chunks)
+        elif value.startswith("<img>"):
+            self.display_image(value[5:])
+            self.output_stack.setCurrentWidget(self.rich_output_panel)
+        elif value.startswith("<div>"):
+            self.rich_output_panel.setHtml(value)
+            self.output_stack.setCurrentWidget(self.rich_output_panel)
+        else:
+            self.display_text(value)
+            self.output_stack.setCurrentWidget(self.output_panel)
+
+    def itemChange(self, change: QGraphicsItem.GraphicsItemChange, value):
+        """Display the pending output once the block is displayed."""
+        if (
+            change
+            in (
+                QGraphicsItem.GraphicsItemChange.ItemSceneHasChanged,
+                QGraphicsItem.GraphicsItemChange.ItemVisibleHasChanged,
+            )
+            and hasattr(self, "output_panel")
+            and self._pending_output
+            and self.is_output_displayed()
+        ):
+            self.display_stdout()
+        return super().itemChange(change, value)
+
+    def update_output_closed(self, has_output: bool):
+        """Open the output panel if there is output, close it otherwise.
+
+        The splitter is only resized when its sizes actually change,
+        as each resize lays out both the source editor and the output panel.
+
+        """
+        if has_output:
             # If output panel is closed and there is output, open it
-            if self.output_closed and value != "":
+            if self.output_closed:
                 self.output_closed = False
-                self.splitter.setSizes(self._splitter_size)
-            # If output panel is open and there is no output, close it
-            elif not self.output_closed and value == "":
-                self._splitter_size = self.splitter.sizes()
-                self.output_closed = True
-                self.splitter.setSizes([1, 0])
+                if self.splitter.sizes() != self._splitter_size:
+                    self.splitter.setSizes(self._splitter_size)
+            return
+
+        # If output panel is open and there is no output, close it
+        if not self.output_closed:
+            self._splitter_size = self.splitter.sizes()
+            self.output_closed = True
+        if self.splitter.sizes()[-1] != 0:
+            self.splitter.setSizes([1, 0])
+
+    def display_text(self, text: str, html: Optional[str] = None):
+        """Display text in the output panel, using html only to render ANSI colors."""
+        cropped_text = self.crop_text(text)
+        if cropped_text is not text:
+            text, html = cropped_text, None
+        if "\x1b" in text:
+            if html is None:
+                html, _ = self.str_to_html(text)
+            self.output_panel.clear()
+            self.output_panel.appendHtml(self.pre_html(html))
+        else:
+            self.output_panel.setPlainText(text.replace("\x08", "").replace("\r", ""))
+
+    def append_text(self, text: str, html: Optional[str] = None):
+        """Append text as new lines of the output panel.
+
+        The html is used even if the text has no ANSI escape codes,
+        to render a style started by the previous lines.
+
+        """
+        cropped_text = self.crop_text(text)
+        if cropped_text is not text:
+            text, html = cropped_text, None
+        if html is not None or "\x1b" in text:
+            if html is None:
+                html, _ = self.str_to_html(text)
+            self.output_panel.appendHtml(self.pre_html(html))
+        else:
+            # Plain text would otherwise take the format of the previous html
+            self.output_panel.setCurrentCharFormat(QTextCharFormat())
+            self.output_panel.appendPlainText(
+                text.replace("\x08", "").replace("\r", "")
+            )
+        self.trim_output()
+
+    def trim_output(self):
+        """Remove the first lines of the output panel beyond MAX_OUTPUT_CHARS.
+
+        Appended texts are only cropped one by one, this keeps the whole
+        streamed output within the limit applied by display_text.
+
+        """
+        document = self.output_panel.document()
+        n_truncated = document.characterCount() - MAX_OUTPUT_CHARS
+        if n_truncated <= 0:
+            return
+        cursor = QTextCursor(document)
+        cursor.setPosition(n_truncated, QTextCursor.MoveMode.KeepAnchor)
+        # Only remove whole lines, with the line break after the last one
+        if not cursor.atBlockStart():
+            cursor.movePosition(
+                QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor
+            )
+            cursor.movePosition(
+                QTextCursor.MoveOperation.NextCharacter,
+                QTextCursor.MoveMode.KeepAnchor,
+            )
+        cursor.removeSelectedText()
+
+    def remove_last_line(self):
+        """Remove the last line of the output panel."""
+        cursor = QTextCursor(self.output_panel.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.movePosition(
+            QTextCursor.MoveOperation.StartOfBlock, QTextCursor.MoveMode.KeepAnchor
+        )
+        # Also remove the line break before the last line
+        cursor.movePosition(
+            QTextCursor.MoveOperation.PreviousCharacter, QTextCursor.MoveMode.KeepAnchor
+        )
+        cursor.removeSelectedText()
+
+    @staticmethod
+    def crop_text(text: str) -> str:
+        """Crop a text too long to be displayed by the output panel.
+
+        Only the end of the text is kept and each of its lines is cropped.
+        The full text is still stored in stdout.
+
+        Returns:
+            The text itself if it doesn't need to be cropped.
+
+        """
+        if len(text) > MAX_OUTPUT_CHARS:
+            n_truncated = CodeBlock.escape_safe_cut(text, len(text) - MAX_OUTPUT_CHARS)
+            text = f"…(truncated {n_truncated} chars)" + text[n_truncated:]
+        if len(text) <= MAX_LINE_LENGTH:
+            return text
+
+        lines = text.split("\n")
+        if all(len(line) <= MAX_LINE_LENGTH for line in lines):
+            return text
+        for i, line in enumerate(lines):
+            if len(line) > MAX_LINE_LENGTH:
+                cut = CodeBlock.escape_safe_cut(line, MAX_LINE_LENGTH)
+                n_truncated = len(line) - cut
+                lines[i] = line[:cut] + f"…(truncated {n_truncated} chars)"
+        return "\n".join(lines)
 
     @staticmethod
-    def str_to_html(text: str) -> str:
-        """Format text so that it's properly displayed by the code block."""
+    def escape_safe_cut(text: str, position: int) -> int:
+        """Move a position to cut a text at before the escape sequence it would split."""
+        escape = text.rfind("\x1b", 0, position)
+        if escape == -1:
+            return position
+        # Parameters of CSI sequences are followed by a final byte in the range 0x40-0x7E
+        for char in text[escape + 2 : position]:
+            if "@" <= char <= "~":
+                return position
+        return escape
+
+    @staticmethod
+    def str_to_html(text: str, style: Style = DEFAULT_STYLE) -> Tuple[str, Style]:
+        """Format text so that it's properly displayed by the code block.
+
+        Converted texts can be joined with newlines, as their styles are closed.
+        The returned style is the one to continue the conversion with.
+
+        """
         # Remove carriage returns and backspaces
         text = text.replace("\x08", "")
         text = text.replace("\r", "")
         # Convert ANSI escape codes to HTML
-        text = ansi2html_converter.convert(text)
-        # Replace background color
-        text = text.replace(
-            "background-color: #000000", "background-color: transparent"
-        )
-        return text
+        return ansi_to_html(text, style)
+
+    @staticmethod
+    def pre_html(html: str) -> str:
+        """Wrap html in a pre element that keeps leading and trailing newlines."""
+        return f"<pre>\n{html}\n</pre>"
 
     def handle_stdout(self, value: str):
         """Handle the stdout signal."""
         # If there is a new line
         # Save every line but the last one
+        new_lines, new_line, value = value.rpartition("\n")
+        if new_line:
+            self._stdout_chunks.append(new_lines)
+            # Only convert the new lines, the previous ones are already converted
+            self._conversion_queue.append(new_lines)
+        self._stdout_tail = value
+        self._stdout = None
+        self._stdout_streamed = True
+
+        if not hasattr(self, "output_panel"):
+            return
+
+        has_output = bool(self._stdout_chunks) or value != ""
+        if self.output_closed and not has_output:
+            return
+        self.update_output_closed(has_output)
+
+        if not self.is_output_displayed():
+            self._output_panel_streamed = False
+            self._pending_output = True
+        elif self._output_panel_streamed:
+            # Update the last line only, new lines are displayed once converted
+            self.remove_last_line()
+            self.append_tail()
+        else:
+            self.display_stdout()
+        self.convert_lines()
 
-        if value.find("\n") != -1:
-            lines = value.split("\n")
-            self._cached_stdout += "\n".join(lines[:-1]) + "\n"
-            value = lines[-1]
+    def convert_lines(self):
+        """Convert the queued chunks of completed lines to html.
 
-        # Update the last line only
-        self.stdout = self._cached_stdout + value
+        Texts with ANSI escape codes are converted in a worker thread,
+        one conversion at a time. Chunks queued in the meantime are
+        converted together by the next one.
+
+        """
+        if self._converting or not self._conversion_queue:
+            return
+        text = "\n".join(self._conversion_queue)
+        lines_converted = partial(
+            self.lines_converted,
+            self._conversion_generation,
+            len(self._conversion_queue),
+        )
+        self._conversion_queue.clear()
+
+        convert = partial(self.str_to_html, style=self._stdout_style)
+        if (
+            "\x1b" not in text and self._stdout_style == DEFAULT_STYLE
+        ) or self.scene() is None:
+            lines_converted(text, *convert(text))
+            return
+
+        self._converting = True
+        worker = ConversionWorker(convert, text)
+        worker.signals.converted.connect(lines_converted)
+        QThreadPool.globalInstance().start(worker)
+
+    def lines_converted(
+        self, generation: int, n_chunks: int, text: str, html: str, style: Style
+    ):
+        """Store and display chunks of completed lines converted to html."""
+        if generation != self._conversion_generation:
+            return
+        self._converting = False
+        styled = "\x1b" in text or self._stdout_style != DEFAULT_STYLE
+        self._stdout_style = style
+        self._cached_stdout_html.append(html + "\n")
+        self._converted_chunks += n_chunks
+
+        if (
+            self._output_panel_streamed
+            and self._displayed_chunks < self._converted_chunks
+            and self.is_output_displayed()
+        ):
+            # Insert the new lines before the last line
+            self.remove_last_line()
+            self.append_text(text, html if styled else None)
+            self.append_tail()
+            self._displayed_chunks = self._converted_chunks
+
+        self.convert_lines()
+
+    def append_tail(self):
+        """Append the last line of stdout, in the style of the converted lines."""
+        html = None
+        if self._stdout_style != DEFAULT_STYLE:
+            html, _ = self.str_to_html(self._stdout_tail, self._stdout_style)
+        self.append_text(self._stdout_tail, html)
 
     @staticmethod
-    def b64_to_html(image: str) -> str:
-        """Transform a base64 encoded image into a html image."""
-        return f'<img src="data:image/png;base64,{image}">'
+    @lru_cache(maxsize=32)
+    def b64_to_pixmap(image: str) -> QPixmap:
+        """Decode a base64 encoded image, identical images are only decoded once."""
+        pixmap = QPixmap()
+        pixmap.loadFromData(QByteArray.fromBase64(image.encode()))
+        return pixmap
+
+    def display_image(self, image: str):
+        """Display a base64 encoded image in the rich output panel."""
+        document = self.rich_output_panel.document()
+        # Clearing the document also releases the previous image resource
+        document.clear()
+        document.addResource(
+            QTextDocument.ResourceType.ImageResource,
+            QUrl(OUTPUT_IMAGE_URL),
+            self.b64_to_pixmap(image),
+        )
+        self.rich_output_panel.setHtml(f'<img src="{OUTPUT_IMAGE_URL}">')
 
     def handle_image(self, image: str):
         """Handle the image signal."""
@@ -7,7 +7,7 @@ An abstract block that allows for execution, like CodeBlocks and Sliders.
 
 """
 
-from typing import List, OrderedDict, Set, Union
+from typing import List, Optional, OrderedDict, Set, Tuple, Union
 from abc import abstractmethod
 from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
@@ -45,6 +45,12 @@ class ExecutableBlock(Block, Executable):
         # Controls the duration of the visual flow animation
         self.transmitting_duration = 500
 
+        # Blocks found by downstream_blocks, dropped when the topology changes
+        self._downstream_cache: Optional[List["ExecutableBlock"]] = None
+        # Socket.topology_version and Executable.state_version when this block
+        # and all its output blocks were last known to be idle
+        self._idle_version: Optional[Tuple[int, int]] = None
+
         if type(self) == ExecutableBlock:
             raise RuntimeError("ExecutableBlock should not be instanciated directly")
 
@@ -208,6 +214,40 @@ class ExecutableBlock(Block, Executable):
 
         return blocks_to_run, to_transmit
 
+    def downstream_blocks(self) -> List["ExecutableBlock"]:
+        """
+        Blocks connected to the outputs of this block, as found by custom_bfs
+
+        The result is cached until an edge is connected, disconnected or toggled
+        and should not be modified.
+
+        Returns:
+            list: Blocks connected to the outputs of this block
+        """
+        if self._downstream_cache is None:
+            self._downstream_cache, _ = self.custom_bfs(self, reverse=True)
+            Socket.topology_caches.add(self)
+        return self._downstream_cache
+
+    def clear_topology_cache(self):
+        """Drop the cached output blocks, called by Socket when an edge changes."""
+        self._downstream_cache = None
+
+    def reset_downstream_states(self):
+        """Set this block and all its output blocks to not run.
+
+        Nothing is done if no executable was run and no edge changed
+        since the last reset.
+
+        """
+        version = (Socket.topology_version, Executable.state_version)
+        if self._idle_version == version:
+            return
+        for block in self.downstream_blocks() + [self]:
+            if block.run_state != ExecutableState.IDLE:
+                block.run_state = ExecutableState.IDLE
+        self._idle_version = version
+
     def right_traversal(self):
         """
         Custom graph traversal utility
@@ -39,6 +39,7 @@ class SizeGrip(QSizeGrip):
     ):  # pylint:disable=unused-argument
         """Stop the resizing."""
         self.resizing = False
+        self.block.flush_pending_updates()
         self.block.scene().history.checkpoint("Resized block", set_modified=True)
 
     @property
@@ -65,7 +66,7 @@ class SizeGrip(QSizeGrip):
         new_height = max(self.block.height + int(delta_y), self.block.min_height)
 
         self.parent().setGeometry(0, 0, int(new_width), int(new_height))
-        self.block.update_all()
+        self.block.schedule_update_all()
 
         self.mouseX = mouseEvent.globalX()
         self.mouseY = mouseEvent.globalY()
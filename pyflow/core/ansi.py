@@ -0,0 +1,203 @@
+# Pyflow an open-source tool for modular visual programing in python
+# Copyright (C) 2021-2022 Bycelium <https://www.gnu.org/licenses/>
+
+""" Module to convert ANSI escape sequences into html.
+
+Only SGR sequences (colors and text styles) are rendered, other control
+sequences (cursor movements, line clearing, ...) are dropped.
+
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+ESCAPE = b"\x1b"
+CSI = b"\x1b["
+
+# Standard colors (SGR 30-37 / 40-47) then bright colors (SGR 90-97 / 100-107)
+COLORS = (
+    "#000000",
+    "#aa0000",
+    "#00aa00",
+    "#aa5500",
+    "#0000aa",
+    "#e850a8",
+    "#00aaaa",
+    "#f5f1de",
+    "#7f7f7f",
+    "#ff0000",
+    "#00ff00",
+    "#ffff00",
+    "#5c5cff",
+    "#ff00ff",
+    "#00ffff",
+    "#ffffff",
+)
+
+# Black backgrounds are rendered transparent to blend in dark panels
+TRANSPARENT_BACKGROUND = COLORS[0]
+
+# (foreground, background, bold, italic, underline)
+Style = Tuple[Optional[str], Optional[str], bool, bool, bool]
+DEFAULT_STYLE: Style = (None, None, False, False, False)
+
+_span_cache: Dict[Style, bytes] = {}
+
+
+def _color_256(index: int) -> str:
+    """Get the html color of an index of the 256 colors palette."""
+    if index < 16:
+        return COLORS[index]
+    if index < 232:
+        index -= 16
+        levels = [
+            0 if c == 0 else 55 + 40 * c
+            for c in (index // 36, index // 6 % 6, index % 6)
+        ]
+        return "#{:02x}{:02x}{:02x}".format(*levels)
+    level = 8 + 10 * (index - 232)
+    return f"#{level:02x}{level:02x}{level:02x}"
+
+
+def _extended_color(codes: List[int], i: int) -> Tuple[Optional[str], int]:
+    """Parse a 38/48 extended color starting at codes[i].
+
+    Returns:
+        The html color (or None if invalid) and the index of the last code used.
+    """
+    if i + 1 < len(codes):
+        if codes[i + 1] == 5 and i + 2 < len(codes):
+            return _color_256(codes[i + 2] % 256), i + 2
+        if codes[i + 1] == 2 and i + 4 < len(codes):
+            red, green, blue = (code % 256 for code in codes[i + 2 : i + 5])
+            return f"#{red:02x}{green:02x}{blue:02x}", i + 4
+    return None, len(codes)
+
+
+def _apply_sgr(style: Style, params: bytes) -> Style:
+    """Compute the style resulting of a SGR sequence parameters."""
+    codes = [int(code) if code.isdigit() else 0 for code in params.split(b";")]
+    foreground, background, bold, italic, underline = style
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code == 0:
+            foreground, background, bold, italic, underline = DEFAULT_STYLE
+        elif code == 1:
+            bold = True
+        elif code == 3:
+            italic = True
+        elif code == 4:
+            underline = True
+        elif code == 22:
+            bold = False
+        elif code == 23:
+            italic = False
+        elif code == 24:
+            underline = False
+        elif 30 <= code <= 37:
+            foreground = COLORS[code - 30]
+        elif 90 <= code <= 97:
+            foreground = COLORS[code - 82]
+        elif code == 39:
+            foreground = None
+        elif 40 <= code <= 47:
+            background = COLORS[code - 40]
+        elif 100 <= code <= 107:
+            background = COLORS[code - 92]
+        elif code == 49:
+            background = None
+        elif code == 38:
+            foreground, i = _extended_color(codes, i)
+        elif code == 48:
+            background, i = _extended_color(codes, i)
+        i += 1
+    return foreground, background, bold, italic, underline
+
+
+def _span(style: Style) -> bytes:
+    """Get the opening span tag of a style."""
+    span = _span_cache.get(style)
+    if span is None:
+        foreground, background, bold, italic, underline = style
+        css = []
+        if foreground is not None:
+            css.append(f"color: {foreground}")
+        if background == TRANSPARENT_BACKGROUND:
+            css.append("background-color: transparent")
+        elif background is not None:
+            css.append(f"background-color: {background}")
+        if bold:
+            css.append("font-weight: bold")
+        if italic:
+            css.append("font-style: italic")
+        if underline:
+            css.append("text-decoration: underline")
+        span = f'<span style="{"; ".join(css)}">'.encode()
+        _span_cache[style] = span
+    return span
+
+
+def _escape(text: bytes) -> bytes:
+    """Escape html special characters."""
+    return text.replace(b"&", b"&amp;").replace(b"<", b"&lt;").replace(b">", b"&gt;")
+
+
+def ansi_to_html(text: str, style: Style = DEFAULT_STYLE) -> Tuple[str, Style]:
+    """Convert a text containing ANSI escape sequences into an html fragment.
+
+    Whitespaces and newlines are kept as is, the fragment should be displayed
+    in an element preserving them.
+
+    Args:
+        text: Text to convert.
+        style: Style active at the start of the text, as returned by the
+            conversion of the text preceding it.
+
+    Returns:
+        The html fragment, its spans all closed, and the style active at its end.
+
+    """
+    data = text.encode("utf-8")
+    html = bytearray()
+    # Style of the span currently open, spans are only opened around text
+    open_style = DEFAULT_STYLE
+
+    def write(content: bytes):
+        nonlocal open_style
+        if not content:
+            return
+        if style != open_style:
+            if open_style != DEFAULT_STYLE:
+                html.extend(b"</span>")
+            if style != DEFAULT_STYLE:
+                html.extend(_span(style))
+            open_style = style
+        html.extend(_escape(content))
+
+    size = len(data)
+    position = 0
+    while position < size:
+        escape_start = data.find(ESCAPE, position)
+        if escape_start == -1:
+            write(data[position:])
+            break
+        write(data[position:escape_start])
+
+        if not data.startswith(CSI, escape_start):
+            # Lone escape character
+            position = escape_start + 1
+            continue
+
+        # Parameters are followed by a final byte in the range 0x40-0x7E
+        end = escape_start + 2
+        while end < size and not 0x40 <= data[end] <= 0x7E:
+            end += 1
+        if end == size:
+            break
+        position = end + 1
+        if data[end] == ord("m"):
+            style = _apply_sgr(style, data[escape_start + 2 : end])
+
+    if open_style != DEFAULT_STYLE:
+        html += b"</span>"
+    return html.decode("utf-8"), style
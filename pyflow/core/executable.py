@@ -19,18 +19,29 @@ class ExecutableState(Enum):
 class Executable:
     """Executable object in pyflow."""
 
+    # Incremented each time an Executable leaves the IDLE state
+    state_version = 0
+
     def __init__(self) -> None:
         """Executable object in pyflow."""
+        # Only set through the run_state setter, which keeps state_version
+        # up to date: blocks skip resetting states while it is unchanged
         self._run_state = ExecutableState.IDLE
 
     @property
     def run_state(self) -> ExecutableState:
-        """The current state of the Executable."""
+        """The current state of the Executable.
+
+        Setting a state other than IDLE increments Executable.state_version.
+
+        """
         return self._run_state
 
     @run_state.setter
     def run_state(self, value: ExecutableState):
         assert isinstance(value, ExecutableState)
+        if value != ExecutableState.IDLE:
+            Executable.state_version += 1
         self._run_state = value
         # Update to force repaint if available
         if hasattr(self, "update"):
@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 from typing import List, Optional, OrderedDict, TYPE_CHECKING
+from weakref import WeakSet
 import math
 
 from PyQt5.QtCore import QPoint, QPointF, QRectF
@@ -34,6 +35,13 @@ class Socket(QGraphicsItem, Serializable):
     }
     MANDATORY_FIELDS = {"position"}
 
+    # Incremented whenever an edge is connected, disconnected or toggled,
+    # used to detect outdated graph states
+    topology_version = 0
+    # Objects caching graph traversals, their clear_topology_cache method
+    # is called on the next topology change
+    topology_caches: WeakSet = WeakSet()
+
     def __init__(
         self,
         block: "Block",
@@ -92,6 +100,16 @@ class Socket(QGraphicsItem, Serializable):
                 edge.remove()
                 return
         self.edges.append(edge)
+        Socket.topology_changed()
+
+    @staticmethod
+    def topology_changed():
+        """Invalidate the cached graph traversals after an edge change."""
+        Socket.topology_version += 1
+        caches = list(Socket.topology_caches)
+        Socket.topology_caches.clear()
+        for cache in caches:
+            cache.clear_topology_cache()
 
     def clear_edge(self):
         """Remove all edges from the socket"""
@@ -102,6 +120,7 @@ class Socket(QGraphicsItem, Serializable):
         """Remove a given edge from the socket edges."""
         if edge in self.edges:
             self.edges.remove(edge)
+            Socket.topology_changed()
             if not self.edges:
                 self.remove()
 
@@ -157,6 +176,7 @@ class Socket(QGraphicsItem, Serializable):
     def toggle(self):
         """Toggle the state of the socket."""
         self.is_on = not self.is_on
+        Socket.topology_changed()
 
     def serialize(self) -> OrderedDict:
         metadata = OrderedDict(sorted(self.metadata.items()))
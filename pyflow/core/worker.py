@@ -4,6 +4,7 @@
 """ Module to create and manage multi-threading workers."""
 
 import asyncio
+from typing import Callable, Tuple
 from PyQt5.QtCore import QObject, pyqtSignal, QRunnable
 
 
@@ -54,3 +55,26 @@ class Worker(QRunnable):
         asyncio.set_event_loop(loop)
         loop.run_until_complete(self.run_code())
         loop.close()
+
+
+class ConversionSignals(QObject):
+    """Defines the signals available from a running conversion thread."""
+
+    # Converted text, its html and the style active at its end
+    converted = pyqtSignal(str, str, object)
+
+
+class ConversionWorker(QRunnable):
+    """Conversion thread, used to convert outputs without blocking the GUI."""
+
+    def __init__(self, convert: Callable[[str], Tuple[str, object]], text: str):
+        """Initialize the conversion worker object."""
+        super().__init__()
+
+        self.convert = convert
+        self.text = text
+        self.signals = ConversionSignals()
+
+    def run(self):
+        """Convert the text and send the result to the GUI."""
+        self.signals.converted.emit(self.text, *self.convert(self.text))
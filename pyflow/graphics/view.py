@@ -383,7 +383,7 @@ class View(QGraphicsView):
         for blockfile_name in block_type_files:
             filepath = os.path.join(BLOCKFILES_PATH, blockfile_name)
             with open(filepath, "r", encoding="utf-8") as file:
-                data = json.loads(file.read())
+                data = json.load(file)
                 title = "New Block"
                 if "title" in data:
                     title = f"New {data['title']} Block"
@@ -210,7 +210,7 @@ class Scene(QGraphicsScene, Serializable):
             filepath: Path to the file to load.
         """
         with open(filepath, "r", encoding="utf-8") as file:
-            data = json.loads(file.read())
+            data = json.load(file)
         return data
 
     def clear(self):
@@ -221,7 +221,7 @@ class Scene(QGraphicsScene, Serializable):
     def create_block_from_file(self, filepath: str, x: float = 0, y: float = 0):
         """Create a new block from a .b file."""
         with open(filepath, "r", encoding="utf-8") as file:
-            data = json.loads(file.read())
+            data = json.load(file)
         data["position"] = [x, y]
         data["sockets"] = {}
         block = self.create_block(data, None, False)
@@ -7,8 +7,13 @@ Integration tests for the CodeBlocks.
 
 import time
 import os
+from typing import List, Optional, Tuple
 import pyautogui
 import pytest
+import pytest_check as check
+
+from PyQt5.QtCore import QThreadPool
+from PyQt5.QtWidgets import QApplication
 
 from pyflow.blocks.codeblock import CodeBlock
 from pyflow.blocks.executableblock import ExecutableState
@@ -16,6 +21,29 @@ from pyflow.blocks.executableblock import ExecutableState
 from tests.integration.utils import apply_function_inapp, CheckingQueue, InAppTest
 
 
+def wait_for_conversions():
+    """Wait for the stdout conversions to be done and displayed."""
+    for _ in range(10):
+        QThreadPool.globalInstance().waitForDone()
+        QApplication.processEvents()
+
+
+def fragment_colors(block: CodeBlock) -> List[Tuple[str, Optional[str]]]:
+    """Texts of the output panel with their color, None being the default color."""
+    fragments = []
+    text_block = block.output_panel.document().begin()
+    while text_block.isValid():
+        iterator = text_block.begin()
+        while not iterator.atEnd():
+            fragment = iterator.fragment()
+            foreground = fragment.charFormat().foreground()
+            color = foreground.color().name() if foreground.style() else None
+            fragments.append((fragment.text(), color))
+            iterator += 1
+        text_block = text_block.next()
+    return fragments
+
+
 class TestCodeBlocks(InAppTest):
     @pytest.fixture(autouse=True)
     def setup(self):
@@ -94,5 +122,33 @@ class TestCodeBlocks(InAppTest):
 
         apply_function_inapp(self.window, testing_path)
 
+    def test_streamed_colors(self):
+        """display plain stdout chunks in the default color after colored ones."""
+        test_block = CodeBlock(title="CodeBlock test")
+        self.widget.scene.addItem(test_block)
+
+        for chunk in ("\x1b[31mred\x1b[0m\n", "plain\n", "tail"):
+            test_block.handle_stdout(chunk)
+            wait_for_conversions()
+
+        expected_colors = [("red", "#aa0000"), ("plain", None), ("tail", None)]
+        check.equal(fragment_colors(test_block), expected_colors)
+        test_block.display_stdout()
+        check.equal(fragment_colors(test_block), expected_colors)
+
+    def test_streamed_rerun(self):
+        """replace the output of the previous run by the streamed stdout."""
+        test_block = CodeBlock(title="CodeBlock test")
+        self.widget.scene.addItem(test_block)
+
+        for run in range(3):
+            test_block.reset_stdout()
+            for chunk in (f"run{run} a\n", f"run{run} b\n"):
+                test_block.handle_stdout(chunk)
+                wait_for_conversions()
+
+        check.equal(test_block.stdout, "run2 a\nrun2 b\n")
+        check.equal(test_block.output_panel.toPlainText(), test_block.stdout)
+
     def test_finish(self):
         self.window.close()
@@ -7,6 +7,8 @@ Integration tests for the execution flow.
 
 import pytest
 import time
+from typing import List
+import pytest_check as check
 
 from pyflow.blocks.codeblock import CodeBlock
 from pyflow.blocks.executableblock import ExecutableState
@@ -130,3 +132,74 @@ class TestCodeBlocksFlow(InAppTest):
 
     def test_finish(self):
         self.window.close()
+
+
+class TestDownstreamStates(InAppTest):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup reused variables."""
+        self.start_app()
+        self.blocks = [CodeBlock(title=f"Test block {i}") for i in range(4)]
+        for block in self.blocks:
+            self.widget.scene.addItem(block)
+        # block 0 -> block 1 -> block 2, block 3 is not connected
+        self.blocks[0].link(self.blocks[1])
+        self.blocks[1].link(self.blocks[2])
+
+    def edit_first_block(self, source: str) -> List[ExecutableState]:
+        """Mark all blocks as run, edit the first one and get the states of all."""
+        for block in self.blocks:
+            block.run_state = ExecutableState.DONE
+        self.blocks[0].source = source
+        return [block.run_state for block in self.blocks]
+
+    def test_edit_connected(self):
+        """reset the states of the blocks connected after an edge is connected."""
+        IDLE, DONE = ExecutableState.IDLE, ExecutableState.DONE
+        check.equal(self.edit_first_block("a = 1"), [IDLE, IDLE, IDLE, DONE])
+
+        self.blocks[2].link(self.blocks[3])
+        check.equal(self.edit_first_block("a = 2"), [IDLE, IDLE, IDLE, IDLE])
+
+    def test_edit_disconnected(self):
+        """keep the states of the blocks disconnected after an edge is removed."""
+        IDLE, DONE = ExecutableState.IDLE, ExecutableState.DONE
+        check.equal(self.edit_first_block("a = 1"), [IDLE, IDLE, IDLE, DONE])
+
+        self.blocks[2].sockets_in[0].edges[0].remove()
+        check.equal(self.edit_first_block("a = 2"), [IDLE, IDLE, DONE, DONE])
+
+    def test_edit_toggled(self):
+        """only reset the states of the blocks connected through sockets on."""
+        IDLE, DONE = ExecutableState.IDLE, ExecutableState.DONE
+        check.equal(self.edit_first_block("a = 1"), [IDLE, IDLE, IDLE, DONE])
+
+        self.blocks[1].sockets_out[0].toggle()
+        check.equal(self.edit_first_block("a = 2"), [IDLE, IDLE, DONE, DONE])
+
+        self.blocks[1].sockets_out[0].toggle()
+        check.equal(self.edit_first_block("a = 3"), [IDLE, IDLE, IDLE, DONE])
+
+    def test_edit_after_run(self):
+        """reset the state of a block run since the previous edit."""
+        IDLE = ExecutableState.IDLE
+        check.equal(
+            self.edit_first_block("a = 1"), [IDLE, IDLE, IDLE, ExecutableState.DONE]
+        )
+
+        # Run the second block as the kernel would, then edit again
+        self.blocks[1].run_state = ExecutableState.RUNNING
+        self.blocks[1].run_state = ExecutableState.DONE
+        self.blocks[0].source = "a = 2"
+        check.equal(self.blocks[1].run_state, IDLE)
+
+    def test_edit_skipped(self):
+        """skip the reset of the states while no block ran and no edge changed."""
+        self.edit_first_block("a = 1")
+        # The output blocks would be searched again if the states were reset
+        self.blocks[0].clear_topology_cache()
+        self.blocks[0].source = "a = 2"
+        check.is_none(self.blocks[0]._downstream_cache)
+
+    def test_finish(self):
+        self.window.close()
@@ -0,0 +1,60 @@
+# Pyflow an open-source tool for modular visual programing in python
+# Copyright (C) 2021-2022 Bycelium <https://www.gnu.org/licenses/>
+
+""" Unit tests for the pyflow codeblock module. """
+
+import pytest_check as check
+
+from pyflow.blocks.codeblock import CodeBlock, MAX_LINE_LENGTH, MAX_OUTPUT_CHARS
+
+
+class TestCropText:
+
+    """Cropping of the texts displayed by the output panel"""
+
+    def test_short_text(self):
+        """should return the text itself if it doesn't need to be cropped."""
+        text = "short\n" + "a" * MAX_LINE_LENGTH
+        check.is_(CodeBlock.crop_text(text), text)
+
+    def test_long_lines(self):
+        """should crop each line longer than MAX_LINE_LENGTH."""
+        text = "a" * (MAX_LINE_LENGTH + 10) + "\nshort\n" + "b" * (MAX_LINE_LENGTH + 1)
+        check.equal(
+            CodeBlock.crop_text(text).split("\n"),
+            [
+                "a" * MAX_LINE_LENGTH + "…(truncated 10 chars)",
+                "short",
+                "b" * MAX_LINE_LENGTH + "…(truncated 1 chars)",
+            ],
+        )
+
+    def test_long_total(self):
+        """should only keep the last MAX_OUTPUT_CHARS of a long text."""
+        lines = [f"{i:09d}" for i in range(MAX_OUTPUT_CHARS // 10 + 5)]
+        text = "\n".join(lines)
+        cropped_text = CodeBlock.crop_text(text)
+        n_truncated = len(text) - MAX_OUTPUT_CHARS
+        check.equal(
+            cropped_text,
+            f"…(truncated {n_truncated} chars)" + text[n_truncated:],
+        )
+        check.is_true(cropped_text.endswith(lines[-1]))
+
+    def test_escape_sequences(self):
+        """should not cut the text inside an ANSI escape sequence."""
+        text = "a" * (MAX_LINE_LENGTH - 2) + "\x1b[31mred"
+        check.equal(
+            CodeBlock.crop_text(text),
+            "a" * (MAX_LINE_LENGTH - 2) + "…(truncated 8 chars)",
+        )
+
+        # The total crop would start inside the escape sequence
+        text = "a" * 10 + "\x1b[31m" + "b\n" * (MAX_OUTPUT_CHARS // 2 - 1)
+        check.equal(len(text) - MAX_OUTPUT_CHARS, 13)
+        cropped_text = CodeBlock.crop_text(text)
+        check.equal(cropped_text, "…(truncated 10 chars)" + text[10:])
+        html, _ = CodeBlock.str_to_html(cropped_text)
+        check.is_true(
+            html.startswith('…(truncated 10 chars)<span style="color: #aa0000">b')
+        )
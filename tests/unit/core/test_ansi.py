@@ -0,0 +1,56 @@
+# Pyflow an open-source tool for modular visual programing in python
+# Copyright (C) 2021-2022 Bycelium <https://www.gnu.org/licenses/>
+
+"""Unit tests for the conversion of ANSI escape sequences to html."""
+
+import pytest_check as check
+
+from pyflow.core.ansi import DEFAULT_STYLE, ansi_to_html
+
+
+class TestAnsiToHtml:
+
+    """Conversion of ANSI escape sequences to html"""
+
+    def test_plain_text(self):
+        """should only escape html special characters of plain text."""
+        check.equal(ansi_to_html("a < b\n&c > d")[0], "a &lt; b\n&amp;c &gt; d")
+
+    def test_colors(self):
+        """should wrap colored text in styled spans."""
+        check.equal(
+            ansi_to_html("\x1b[31mred\x1b[0m default")[0],
+            '<span style="color: #aa0000">red</span> default',
+        )
+        check.equal(
+            ansi_to_html("\x1b[1;38;5;196mbold\x1b[39;22m")[0],
+            '<span style="color: #ff0000; font-weight: bold">bold</span>',
+        )
+
+    def test_unclosed_style(self):
+        """should close the span of a style still active at the end of the text."""
+        check.equal(
+            ansi_to_html("\x1b[4munderlined")[0],
+            '<span style="text-decoration: underline">underlined</span>',
+        )
+
+    def test_carried_style(self):
+        """should continue the style active at the end of the previous text."""
+        html, style = ansi_to_html("\x1b[31mline1\n")
+        check.equal(html, '<span style="color: #aa0000">line1\n</span>')
+        html, style = ansi_to_html("line2", style)
+        check.equal(html, '<span style="color: #aa0000">line2</span>')
+        html, style = ansi_to_html("\x1b[0mline3", style)
+        check.equal(html, "line3")
+        check.equal(style, DEFAULT_STYLE)
+
+    def test_black_background(self):
+        """should render black backgrounds as transparent."""
+        check.equal(
+            ansi_to_html("\x1b[40mtext")[0],
+            '<span style="background-color: transparent">text</span>',
+        )
+
+    def test_other_sequences(self):
+        """should drop control sequences that are not styles."""
+        check.equal(ansi_to_html("\x1b[2Kline\x1b[1A\x1b")[0], "line")
@@ -126,7 +126,7 @@ def check_conversion_coherence(ipynb_data: OrderedDict, ipyg_data: OrderedDict):
 def load_json(file_path: str):
     """Helper function that returns the ipynb data in a given file."""
     with open(file_path, "r", encoding="utf-8") as file:
-        data = json.loads(file.read())
+        data = json.load(file)
     return data
 
 
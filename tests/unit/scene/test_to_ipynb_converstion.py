@@ -29,7 +29,7 @@ class TestToIpynbConversion:
         file_path = "./tests/assets/simple_flow.ipyg"
         ipyg_data: OrderedDict = {}
         with open(file_path, "r", encoding="utf-8") as file:
-            ipyg_data = json.loads(file.read())
+            ipyg_data = json.load(file)
         ipynb_data = ipyg_to_ipynb(ipyg_data)
 
         check.equal("cells" in ipynb_data, True)